@@ -2,15 +2,16 @@
 
 import os
 import datetime
-from time import sleep
+from time import sleep, perf_counter
 import subprocess
 import numpy as np
 import pandas as pd
 from pathlib import Path
+from tempfile import mkdtemp
 from sqlalchemy import create_engine
 from sqlalchemy_utils import database_exists, create_database
 from threading import Thread
-from shutil import get_terminal_size
+from shutil import get_terminal_size, rmtree
 from pytrends.request import TrendReq
 import configparser
 
@@ -141,6 +142,16 @@ class config_handler:
                     if not self.read_config.has_option(section, option):
                         self.write_config[str(section)]['db'] = 'population'
 
+        # write compute engine settings #
+        for section in ['engine']:
+            if not self.read_config.has_section(section):
+                self.write_config.add_section('engine')
+
+                for option in ['compute', 'benchmark']:
+                    if not self.read_config.has_option(section, option):
+                        self.write_config[str(section)]['compute'] = 'dataframe'
+                        self.write_config[str(section)]['benchmark'] = 'no'
+
         # Write Information to .ini File #
         with open(self.config, 'a') as f:
             self.write_config.write(f)
@@ -168,6 +179,42 @@ class Covid_Database:
         # Location of Main Database CSV backups #
         self.database_directory = local_directory
 
+        # Location of Versioned Snapshots and Change Feed #
+        self.snapshot_directory = self.database_directory / 'snapshots'
+        self.snapshot_keys = ['fips', 'date']
+        self.snapshot_base_interval = 10
+
+        # Columns of the Master Dataframe #
+        self.output_columns = [
+            'date',
+            'state',
+            'county',
+            'fips',
+            'cases_daily',
+            'deaths_daily',
+            'cases_total',
+            'deaths_total',
+            'cases_daily_avg',
+            'deaths_daily_avg',
+            'cases_per_1k',
+            'deaths_per_1k',
+            'death_rate',
+        ]
+
+        # Location of Memory-Mapped fips x date x metric Array #
+        self.cube_directory = self.database_directory / 'cube'
+        self.cube_metrics = [
+            'cases',
+            'deaths',
+            'cases_daily',
+            'deaths_daily',
+            'cases_daily_avg',
+            'deaths_daily_avg',
+            'cases_per_1k',
+            'deaths_per_1k',
+            'death_rate',
+        ]
+
         # Blank objects to store data #
         self.df = pd.DataFrame()
         self.dict = {}
@@ -237,6 +284,22 @@ class Covid_Database:
         self.done = False
 
         self.mysql = False
+        self.engine = 'dataframe'
+        self.benchmark = False
+
+    def _use_cube(self):
+        self.config = local_directory / 'covid19_config.ini'
+        self.read_config = configparser.ConfigParser(strict=False)
+        self.read_config.read(self.config)
+
+        return self.read_config.get('engine', 'compute', fallback='dataframe').lower() == 'cube'
+
+    def _use_benchmark(self):
+        self.config = local_directory / 'covid19_config.ini'
+        self.read_config = configparser.ConfigParser(strict=False)
+        self.read_config.read(self.config)
+
+        return self.read_config.getboolean('engine', 'benchmark', fallback=False)
 
     def _use_mysql(self):
         self.config = local_directory / 'covid19_config.ini'
@@ -512,10 +575,6 @@ class Covid_Database:
 
     # Clean Results #
     def _clean_data(self):
-        _state_data_directory = f'{self.database_directory}/state_data/'
-        if not os.path.isdir(_state_data_directory):
-            os.mkdir(_state_data_directory)
-
         # Format State and County names to Uppercase #
         _data = self._merge_data()
         _data['state'] = _data['state'].str.upper()
@@ -524,7 +583,10 @@ class Covid_Database:
         # Delete Duplicates and Sort #
         self._printout('Removing Duplicates and Sorting')
         _data = _data.drop_duplicates(ignore_index=True)
-        _data = _data.sort_values(by=['state', 'county', 'date'])
+        _data = _data.sort_values(by=['state', 'county', 'date'], kind='stable')
+
+        # One Row per County and Date, Historical Data takes priority over Live Data #
+        _data = _data.drop_duplicates(subset=['state', 'county', 'date'], keep='last')
         _data = _data.reset_index(drop=True)
 
         # ## EDIT OUT, PULLS SAMPLE FOR TABLEAU ##
@@ -555,16 +617,8 @@ class Covid_Database:
         _us_data['fips'] = '00000'
 
         _data = pd.concat([_data, _us_data], ignore_index=True)
-        _data["cases_daily"] = _data.groupby('fips')["cases"].diff(1)
-        _data["deaths_daily"] = _data.groupby('fips')["deaths"].diff(1)
-        _data["cases_daily"] = _data["cases_daily"].fillna(0).astype('int32')
-        _data["deaths_daily"] = _data["deaths_daily"].fillna(0).astype('int32')
-
-        # Infected Death Rate #
-        _data['death_rate'] = (_data['deaths'] / _data['cases'])
-        _data['death_rate'] = _data['death_rate'].round(4)
 
-        # Per 1k #
+        # Remove Unknown Fips Codes #
         _data['fips'] = _data['fips'].astype(str).str.zfill(5)
         _data = _data.loc[_data['fips'] != '00nan']
         _data = _data.loc[_data['fips'] != '02997']
@@ -574,8 +628,55 @@ class Covid_Database:
         _data = _data.loc[_data['fips'] != '48999']
         _data['fips'] = _data['fips'].fillna(0)
 
-        # Population Calculations #
+        # One Row per FIPS and Date, the key of the Snapshots and the Array Engine #
+        _data = _data.drop_duplicates(subset=self.snapshot_keys, keep='last')
+
+        # Population per FIPS #
         _data['population'] = [self.population_dict[_] for _ in _data['fips']]
+
+        # Daily, Per 1k and Smoothed Calculations #
+        if self.benchmark:
+            self._printout('Benchmarking Compute Engines')
+            _data = self._benchmark_engines(_data)
+        elif self.engine == 'cube':
+            self._printout('Building fips x date x metric Array')
+            _data = self._cube_calculations(_data)
+        else:
+            _data = self._dataframe_calculations(_data)
+
+        # Reformat Columns #
+        _data = _data.rename(columns={'cases': 'cases_total', 'deaths': 'deaths_total'})
+        _data = _data[self.output_columns]
+        _data['date'] = pd.to_datetime(_data['date'], format='%Y-%m-%d')
+
+        # Create Copy of Master Dataframe #
+        self.df = _data.copy()
+
+        # Store Versioned Snapshot of Changed Rows #
+        self._printout('Saving Versioned Snapshot')
+        self._snapshot_data()
+
+        # Save Per State Data #
+        self._save_state_data()
+
+    # DataFrame Compute Engine #
+    @staticmethod
+    def _dataframe_calculations(_data):
+        """
+        Calculates daily, per 1k and smoothed values on the long format data with groupby('fips')
+        :rtype: Dataframe Object
+        """
+        _data = _data.copy()
+        _data["cases_daily"] = _data.groupby('fips')["cases"].diff(1)
+        _data["deaths_daily"] = _data.groupby('fips')["deaths"].diff(1)
+        _data["cases_daily"] = _data["cases_daily"].fillna(0).astype('int32')
+        _data["deaths_daily"] = _data["deaths_daily"].fillna(0).astype('int32')
+
+        # Infected Death Rate #
+        _data['death_rate'] = (_data['deaths'] / _data['cases'])
+        _data['death_rate'] = _data['death_rate'].round(4)
+
+        # Population Calculations #
         _data['cases_per_1k'] = ((_data['cases'] / _data['population']) * 1000).astype('float64').round(2)
         _data['deaths_per_1k'] = ((_data['deaths'] / _data['population']) * 1000).astype('float64').round(2)
 
@@ -585,30 +686,246 @@ class Covid_Database:
         _data['cases_daily_avg'] = _data['cases_daily_avg'].astype('float64').round(2)
         _data['deaths_daily_avg'] = _data['deaths_daily_avg'].astype('float64').round(2)
 
-        # Reformat Columns #
-        _data = _data.rename(columns={'cases': 'cases_total', 'deaths': 'deaths_total'})
-        _data = _data[[
-            'date',
-            'state',
-            'county',
-            'fips',
-            'cases_daily',
-            'deaths_daily',
-            'cases_total',
-            'deaths_total',
-            'cases_daily_avg',
-            'deaths_daily_avg',
-            'cases_per_1k',
-            'deaths_per_1k',
-            'death_rate',
-        ]]
-        _data['date'] = pd.to_datetime(_data['date'], format='%Y-%m-%d')
+        return _data
 
-        # List of States #
-        states = _data['state'].unique().tolist()
+    # Build Memory-Mapped fips x date x metric Array #
+    def _build_cube(self, _data, directory=None):
+        """
+        Pivots the long format data into a dense fips x date x metric array stored as a memory-mapped .npy
+        file, with fips and date index maps, then calculates every metric as an axis operation
+        :param directory: Where the array is saved, cube_directory if None
+        :rtype: Memory-Mapped Array, CSV Files
+        """
+        directory = self.cube_directory if directory is None else directory
+        if not os.path.isdir(directory):
+            os.mkdir(directory)
+
+        # Cube Cells are unique per (fips, date), the same rule _clean_data applies for both engines #
+        if _data.duplicated(subset=self.snapshot_keys).any():
+            raise ValueError('Array engine requires one row per (fips, date)')
+
+        # Index Maps, fips keep their order of first appearance (state, county, then the US row) #
+        # so the long format can be rebuilt in the same row order #
+        _fips_index = _data[['fips', 'state', 'county', 'population']].drop_duplicates(subset=['fips'])
+        _fips_index = _fips_index.reset_index(drop=True)
+        _date_index = pd.DataFrame({'date': pd.date_range(_data['date'].min(), _data['date'].max(), freq='D')})
+        _fips_index.to_csv(directory / 'fips_index.csv', index_label='i')
+        _date_index.to_csv(directory / 'date_index.csv', index_label='j')
+
+        _i = pd.Index(_fips_index['fips']).get_indexer(_data['fips'])
+        _j = pd.Index(_date_index['date']).get_indexer(_data['date'])
+        _shape = (len(_fips_index), len(_date_index))
+
+        # Mask of (fips, date) cells present in the long format data #
+        present = np.lib.format.open_memmap(
+            directory / 'present.npy', mode='w+', dtype='bool', shape=_shape
+        )
+        present[:] = False
+        present[_i, _j] = True
 
-        # Create Copy of Master Dataframe #
-        self.df = _data.copy()
+        cube = np.lib.format.open_memmap(
+            directory / 'covid_cube.npy', mode='w+', dtype='float64', shape=_shape + (len(self.cube_metrics),)
+        )
+        m = {metric: k for k, metric in enumerate(self.cube_metrics)}
+        cube[:] = np.nan
+
+        # Totals, carried forward over missing dates #
+        for metric in ['cases', 'deaths']:
+            _totals = np.full(_shape, np.nan)
+            _totals[_i, _j] = _data[metric].to_numpy(dtype='float64')
+            cube[:, :, m[metric]] = pd.DataFrame(_totals).ffill(axis=1).to_numpy()
+
+        # Present Cells in long format order, each window covers the last 14 present days of a fips #
+        _i, _j = np.nonzero(present)
+        _position = np.arange(len(_i))
+        _window_start = np.maximum(np.searchsorted(_i, _i), _position - 13)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Daily Cases/Deaths, change since the previous present day #
+            for metric in ['cases', 'deaths']:
+                _daily = np.diff(cube[:, :, m[metric]], axis=1, prepend=np.nan)
+                _daily = np.where(present, _daily, np.nan)
+                _daily[present & np.isnan(_daily)] = 0
+                cube[:, :, m[f'{metric}_daily']] = _daily
+
+                # 14 Day Smoothing #
+                _sum = np.concatenate([[0], np.cumsum(_daily[_i, _j])])
+                cube[_i, _j, m[f'{metric}_daily_avg']] = np.round(
+                    (_sum[_position + 1] - _sum[_window_start]) / (_position - _window_start + 1), 2
+                )
+
+            # Per 1k #
+            _population = _fips_index['population'].to_numpy(dtype='float64')[:, None]
+            cube[:, :, m['cases_per_1k']] = np.round(cube[:, :, m['cases']] / _population * 1000, 2)
+            cube[:, :, m['deaths_per_1k']] = np.round(cube[:, :, m['deaths']] / _population * 1000, 2)
+
+            # Infected Death Rate #
+            cube[:, :, m['death_rate']] = np.round(cube[:, :, m['deaths']] / cube[:, :, m['cases']], 4)
+
+        cube.flush()
+        present.flush()
+        return cube
+
+    # Load Memory-Mapped Array and Index Maps #
+    def _load_cube(self, directory=None):
+        directory = self.cube_directory if directory is None else directory
+        cube = np.load(directory / 'covid_cube.npy', mmap_mode='r')
+        present = np.load(directory / 'present.npy', mmap_mode='r')
+        _fips_index = pd.read_csv(directory / 'fips_index.csv', index_col='i', dtype={'fips': str})
+        _date_index = pd.read_csv(directory / 'date_index.csv', index_col='j', parse_dates=['date'])
+        return cube, present, _fips_index, _date_index
+
+    # Rebuild Long Format from Array #
+    def _cube_to_frame(self, directory=None):
+        """
+        Rebuilds the long format data from the present cells of the memory-mapped array
+        :param directory: Where the array is saved, cube_directory if None
+        :rtype: Dataframe Object
+        """
+        cube, present, _fips_index, _date_index = self._load_cube(directory)
+        _i, _j = np.nonzero(present)
+
+        _data = pd.DataFrame({
+            'date': _date_index['date'].to_numpy()[_j],
+            'state': _fips_index['state'].to_numpy()[_i],
+            'county': _fips_index['county'].to_numpy()[_i],
+            'fips': _fips_index['fips'].to_numpy()[_i],
+            'population': _fips_index['population'].to_numpy()[_i],
+        })
+        for k, metric in enumerate(self.cube_metrics):
+            _data[metric] = cube[_i, _j, k]
+
+        _data = _data.astype(
+            {
+                'state': 'string',
+                'county': 'string',
+                'cases': 'int32',
+                'deaths': 'int32',
+                'cases_daily': 'int32',
+                'deaths_daily': 'int32',
+            }
+        )
+        return _data
+
+    # Array Compute Engine #
+    def _cube_calculations(self, _data, directory=None):
+        self._build_cube(_data, directory)
+        return self._cube_to_frame(directory)
+
+    # Pivot State Series onto the Array's Date Axis #
+    @staticmethod
+    def _state_series(path, column, states, dates):
+        _data = pd.read_csv(path, usecols=['date', 'state', column], parse_dates=['date'])
+        _data = _data.pivot_table(index='state', columns='date', values=column, aggfunc='last')
+        return _data.reindex(index=states, columns=dates).to_numpy(dtype='float64')
+
+    # Correlation of each Row, ignoring missing values #
+    @staticmethod
+    def _row_correlation(x, y):
+        _valid = ~(np.isnan(x) | np.isnan(y))
+        n = _valid.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _x = np.where(_valid, x - np.nansum(np.where(_valid, x, 0), axis=1)[:, None] / n[:, None], 0)
+            _y = np.where(_valid, y - np.nansum(np.where(_valid, y, 0), axis=1)[:, None] / n[:, None], 0)
+            r = (_x * _y).sum(axis=1) / np.sqrt((_x ** 2).sum(axis=1) * (_y ** 2).sum(axis=1))
+        return np.round(r, 4), n
+
+    # Case Growth against Google Trend and Vaccine Series #
+    def _cube_correlations(self):
+        """
+        Aggregates the array to states and correlates smoothed daily cases against Google search trend
+        and daily administered vaccines for every state at once
+        :rtype: Dataframe Object, CSV File
+        """
+        cube, present, _fips_index, _date_index = self._load_cube()
+        _dates = _date_index['date']
+
+        # State Aggregation, state x fips membership matrix against the fips axis #
+        _states, _membership = np.unique(_fips_index['state'].to_numpy(), return_inverse=True)
+        _matrix = np.zeros((len(_states), len(_fips_index)))
+        _matrix[_membership, np.arange(len(_fips_index))] = 1
+        _growth = _matrix @ np.where(present, cube[:, :, self.cube_metrics.index('cases_daily_avg')], 0)
+        _growth[:, ~present.any(axis=0)] = np.nan
+
+        _trend = self._state_series(
+            self.database_directory / 'google_trend_data.csv', 'google_trend', _states, _dates
+        )
+        _administered = self._state_series(
+            self.database_directory / 'vaccine_data.csv', 'administered', _states, _dates
+        )
+        _administered_daily = np.diff(_administered, axis=1, prepend=np.nan)
+
+        trend_corr, trend_n = self._row_correlation(_growth, _trend)
+        vaccine_corr, vaccine_n = self._row_correlation(_growth, _administered_daily)
+
+        _data = pd.DataFrame({
+            'state': _states,
+            'trend_correlation': trend_corr,
+            'trend_observations': trend_n,
+            'vaccine_correlation': vaccine_corr,
+            'vaccine_observations': vaccine_n,
+        })
+
+        if self.mysql:
+            _data.to_sql(
+                name='state_correlations',
+                con=self._mysql('covid'),
+                if_exists='replace',
+                index=False,
+                chunksize=100,
+                method='multi'
+            )
+
+        _data.to_csv(self.cube_directory / 'state_correlations.csv', index=False)
+        return _data
+
+    # Time DataFrame and Array Compute Engines #
+    def _benchmark_engines(self, _data):
+        """
+        Times the DataFrame and array engines on the same data and compares their outputs. Each engine runs
+        once, when the array engine is not configured its array is built in a temporary directory
+        :rtype: Dataframe Object from the configured engine
+        """
+        _start = perf_counter()
+        _frame = self._dataframe_calculations(_data)
+        _frame_time = perf_counter() - _start
+
+        _directory = self.cube_directory if self.engine == 'cube' else Path(mkdtemp())
+        try:
+            _start = perf_counter()
+            _cube = self._cube_calculations(_data, _directory)
+            _cube_time = perf_counter() - _start
+        finally:
+            # Memory-Maps are released by now, a failed cleanup only leaves a temporary directory behind #
+            if _directory != self.cube_directory:
+                rmtree(_directory, ignore_errors=True)
+
+        # Compare Outputs Value by Value on (fips, date) #
+        _matching = 0
+        if len(_frame) == len(_cube):
+            _a = _frame.sort_values(by=self.snapshot_keys, ignore_index=True)
+            _b = _cube.sort_values(by=self.snapshot_keys, ignore_index=True)
+            if _a[self.snapshot_keys].equals(_b[self.snapshot_keys]):
+                for metric in self.cube_metrics:
+                    _x = _a[metric].to_numpy(dtype='float64')
+                    _y = _b[metric].to_numpy(dtype='float64')
+                    _matching += int(((_x == _y) | (np.isnan(_x) & np.isnan(_y))).sum())
+
+        self._printout(
+            f'Benchmark: DataFrame {_frame_time:.2f}s ({len(_frame)} rows), Array {_cube_time:.2f}s '
+            f'({len(_cube)} rows), {_matching / max(len(_frame) * len(self.cube_metrics), 1):.2%} of values match'
+        )
+
+        return _cube if self.engine == 'cube' else _frame
+
+    # Save Master Dataframe per State #
+    def _save_state_data(self):
+        _state_data_directory = f'{self.database_directory}/state_data/'
+        if not os.path.isdir(_state_data_directory):
+            os.mkdir(_state_data_directory)
+
+        # List of States #
+        states = self.df['state'].unique().tolist()
 
         # Per State Loop #
         for state in states:
@@ -636,6 +953,212 @@ class Covid_Database:
             self._printout(f'Saving {state} Data to HDD')
             output_data.to_csv(f'{_state_data_directory}/{_state}_covid.csv', index=False)
 
+        # Remove State Files no longer in the Dataset #
+        _state_files = [str(state).replace(' ', '_').lower() + '_covid.csv' for state in states]
+        for _file in os.listdir(_state_data_directory):
+            if _file.endswith('_covid.csv') and _file not in _state_files:
+                os.remove(os.path.join(_state_data_directory, _file))
+
+    # Read Snapshot Manifest #
+    def _read_manifest(self):
+        _manifest = self.snapshot_directory / 'manifest.csv'
+        if not os.path.isfile(_manifest):
+            return pd.DataFrame()
+        return pd.read_csv(_manifest)
+
+    # Read Delta File #
+    @staticmethod
+    def _read_delta(path):
+        return pd.read_csv(
+            path,
+            dtype={'fips': str, 'state': 'string', 'county': 'string', 'change': 'string'},
+            parse_dates=['date'],
+            compression='gzip'
+        )
+
+    # Rebuild Dataset from Snapshots #
+    def _load_snapshot(self, version=None):
+        """
+        Rebuilds the dataset as of a snapshot version from the latest base file at or before it,
+        plus the delta files saved after that base
+        :param version: Snapshot version to rebuild, latest version if None
+        :rtype: Dataframe Object
+        """
+        _manifest = self._read_manifest()
+        if _manifest.empty:
+            if version is None:
+                return pd.DataFrame(columns=self.output_columns)
+            raise ValueError(f'Snapshot v{version} not found, no snapshots have been saved')
+
+        _versions = _manifest['version']
+        if version is None:
+            version = int(_versions.max())
+        if version not in _versions.values:
+            raise ValueError(
+                f'Snapshot v{version} not found, saved versions are v{_versions.min()} to v{_versions.max()}'
+            )
+        _manifest = _manifest.loc[_versions <= version]
+
+        # Start from the latest Base File #
+        _frames = []
+        _bases = _manifest.loc[_manifest['base_file'].notna()]
+        if not _bases.empty:
+            _base = _bases.iloc[-1]
+            _frames.append(self._read_delta(self.snapshot_directory / _base['base_file']))
+            _manifest = _manifest.loc[_manifest['version'] > _base['version']]
+
+        # Apply Deltas, the last change per (fips, date) wins #
+        for delta_file in _manifest['delta_file']:
+            _frames.append(self._read_delta(self.snapshot_directory / delta_file))
+
+        _data = pd.concat(_frames, ignore_index=True).reindex(columns=self.output_columns + ['change'])
+        _data = _data.drop_duplicates(subset=self.snapshot_keys, keep='last')
+        _data = _data.loc[_data['change'].fillna('base') != 'delete']
+
+        _data = _data.sort_values(by=['state', 'county', 'date']).reset_index(drop=True)
+
+        # Delete Rows leave the Integer Columns as floats in the Delta Files #
+        _data = _data[self.output_columns].astype(
+            {
+                'cases_daily': 'int32',
+                'deaths_daily': 'int32',
+                'cases_total': 'int32',
+                'deaths_total': 'int32',
+            }
+        )
+        return _data
+
+    # Compare Dataset against Previous Snapshot #
+    def _diff_snapshot(self, previous, current):
+        """
+        Finds rows inserted, updated or deleted since the previous snapshot, keyed by (fips, date)
+        :rtype: Dataframe Object with a 'change' column
+        """
+        _keys = self.snapshot_keys
+        _values = [c for c in current.columns if c not in _keys]
+
+        _merged = current.merge(
+            previous, how='outer', on=_keys, suffixes=('', '_previous'), indicator=True, validate='one_to_one'
+        )
+
+        # Compare Every Value Column, treating missing values on both sides as equal #
+        _changed = pd.Series(False, index=_merged.index)
+        for c in _values:
+            _new, _old = _merged[c], _merged[f'{c}_previous']
+            _equal = _new.eq(_old).fillna(False).astype(bool) | (_new.isna() & _old.isna())
+            _changed = _changed | ~_equal
+
+        _merged['change'] = None
+        _merged.loc[_merged['_merge'] == 'left_only', 'change'] = 'insert'
+        _merged.loc[(_merged['_merge'] == 'both') & _changed, 'change'] = 'update'
+        _merged.loc[_merged['_merge'] == 'right_only', 'change'] = 'delete'
+
+        _delta = _merged.loc[_merged['change'].notna(), list(current.columns) + ['change']]
+        return _delta.reset_index(drop=True)
+
+    # Versioned Snapshot with Delta Storage #
+    def _snapshot_data(self, source='run'):
+        """
+        Stores only rows changed since the last version as a compressed delta file, appends them to the
+        change feed and records the version and its storage growth in the manifest. Every
+        snapshot_base_interval versions the full dataset is also saved as a base file
+        :param source: What created the version, recorded in the manifest
+        :rtype: CSV Files
+        """
+        if not os.path.isdir(self.snapshot_directory):
+            os.mkdir(self.snapshot_directory)
+
+        _manifest = self._read_manifest()
+        version = 1 if _manifest.empty else int(_manifest['version'].max()) + 1
+
+        _current = self.df.reset_index(drop=True)
+
+        # First Version stores every row as an insert #
+        _previous = self._load_snapshot()
+        if _previous.empty:
+            _delta = _current.assign(change='insert')
+        else:
+            _delta = self._diff_snapshot(_previous, _current)
+
+        if _delta.empty:
+            self._printout(f'No Changes since Snapshot v{version - 1}')
+            return
+
+        # Save Delta File #
+        delta_file = f'v{version:04d}_delta.csv.gz'
+        _delta.to_csv(self.snapshot_directory / delta_file, index=False, compression='gzip')
+
+        # Append to Change Feed, with the row values so consumers can apply it directly #
+        _feed = _delta.copy()
+        _feed.insert(0, 'version', version)
+        _feed.insert(1, 'created', self.now)
+        _feed.insert(2, 'delta_file', delta_file)
+        _feed_file = self.snapshot_directory / 'change_feed.csv'
+        _feed.to_csv(_feed_file, mode='a', header=not os.path.isfile(_feed_file), index=False)
+
+        if self.mysql:
+            _feed.to_sql(
+                name='change_feed',
+                con=self._mysql('covid'),
+                if_exists='append',
+                index=False,
+                chunksize=100,
+                method='multi'
+            )
+
+        # Save Base File #
+        base_file = None
+        base_bytes = 0
+        if version % self.snapshot_base_interval == 0:
+            base_file = f'v{version:04d}_base.csv.gz'
+            _current.to_csv(self.snapshot_directory / base_file, index=False, compression='gzip')
+            base_bytes = os.path.getsize(self.snapshot_directory / base_file)
+
+        # Storage Growth per Version #
+        delta_bytes = os.path.getsize(self.snapshot_directory / delta_file)
+        total_bytes = delta_bytes + base_bytes
+        total_bytes += 0 if _manifest.empty else int(_manifest['total_bytes'].iloc[-1])
+        _counts = _delta['change'].value_counts()
+
+        _entry = pd.DataFrame([{
+            'version': version,
+            'created': self.now,
+            'source': source,
+            'delta_file': delta_file,
+            'base_file': base_file,
+            'rows': len(_current),
+            'inserts': int(_counts.get('insert', 0)),
+            'updates': int(_counts.get('update', 0)),
+            'deletes': int(_counts.get('delete', 0)),
+            'delta_bytes': delta_bytes,
+            'base_bytes': base_bytes,
+            'total_bytes': total_bytes,
+        }])
+        _entry.to_csv(
+            self.snapshot_directory / 'manifest.csv',
+            mode='a',
+            header=_manifest.empty,
+            index=False
+        )
+
+        self._printout(
+            f'Snapshot v{version}: {_entry["inserts"][0]} inserts, {_entry["updates"][0]} updates, '
+            f'{_entry["deletes"][0]} deletes, +{(delta_bytes + base_bytes) / 1024:.1f} KB '
+            f'({total_bytes / 1024:.1f} KB total)'
+        )
+
+    # Roll Back to an Earlier Snapshot #
+    def rollback(self, version):
+        """
+        Restores the per state CSV files (and MySQL tables) to the dataset as of a snapshot version.
+        The rollback is saved as a new version, so the change feed carries the reverse delta
+        :param version: Snapshot version to restore
+        """
+        self.mysql = self._use_mysql()
+        self.df = self._load_snapshot(version)
+        self._snapshot_data(source=f'rollback to v{version}')
+        self._save_state_data()
+
     # Run Main Program #
     def run(self):
         print("\nCovid_Database_0.0.2 by Jordan Bradley\n")
@@ -643,6 +1166,8 @@ class Covid_Database:
         # Configuration #
         config_handler().run()
         self.mysql = self._use_mysql()
+        self.engine = 'cube' if self._use_cube() else 'dataframe'
+        self.benchmark = self._use_benchmark()
 
         # Pull Population Data from US Census Bureau #
         self._printout('Population Data')
@@ -662,6 +1187,11 @@ class Covid_Database:
         self._merge_data()
         self._clean_data()
 
+        # Correlate Case Growth against Google Trend and Vaccine Data #
+        if self.engine == 'cube':
+            self._printout('Calculating State Correlations')
+            self._cube_correlations()
+
         # Stop Script #
         self._printout('Database Update Complete')
         self._thread_stop()